@@ -2,25 +2,32 @@
 High School Management System API
 
 A super simple FastAPI application that allows students to view and sign up
-for extracurricular activities at Mergington High School.
+for extracurricular activities at Mergington High School and the other schools
+in its district.
 """
 
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from typing import Literal, Optional
+
+from fastapi import APIRouter, FastAPI, HTTPException, Query, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, Response
+import json
 import os
 from pathlib import Path
 
-app = FastAPI(title="Mergington High School API",
-              description="API for viewing and signing up for extracurricular activities")
+try:
+    from .compression import MINIMUM_SIZE, CompressionMiddleware, negotiate
+    from .store import ActivityNotFoundError, ParticipantError, SchoolRegistry, worker_for
+except ImportError:
+    from compression import MINIMUM_SIZE, CompressionMiddleware, negotiate
+    from store import ActivityNotFoundError, ParticipantError, SchoolRegistry, worker_for
 
-# Mount the static files directory
 current_dir = Path(__file__).parent
-app.mount("/static", StaticFiles(directory=os.path.join(Path(__file__).parent,
-          "static")), name="static")
+router = APIRouter()
 
-# In-memory activity database
-activities = {
+# Seed catalog for the default school; each app instance gets its own copy
+seed_activities = {
     "Chess Club": {
         "description": "Learn strategies and compete in chess tournaments",
         "schedule": "Fridays, 3:30 PM - 5:00 PM",
@@ -81,49 +88,222 @@ activities = {
 }
 
 
-@app.get("/")
+# Each school is a separate shard; the un-prefixed /activities routes serve
+# the default school so existing clients keep working
+DEFAULT_SCHOOL = "mergington"
+
+# District used when no SCHOOLS_FILE is configured
+default_schools = {
+    DEFAULT_SCHOOL: {"name": "Mergington High School", "activities": seed_activities}
+}
+
+
+def load_school_config(path):
+    """Read a district file mapping school ids to {"name", "activities"}"""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def get_store(request: Request, school_id: str = DEFAULT_SCHOOL):
+    """Look up a school's shard on the serving app
+
+    Fails with 421 (and the owning worker in X-School-Worker) when the
+    school belongs to another worker process, or 404 when it is unknown.
+    """
+    schools = request.app.state.schools
+    if school_id not in schools:
+        owner = request.app.state.school_workers.get(school_id)
+        if owner is not None:
+            raise HTTPException(status_code=421, detail="School is served by another worker",
+                                headers={"X-School-Worker": str(owner)})
+        raise HTTPException(status_code=404, detail="School not found")
+    return schools.get(school_id)
+
+
+def list_activities(store, request: Request):
+    """Serve a school's catalog, reusing its cached serialized/compressed bytes"""
+    body = store.serialized()
+    if len(body) < MINIMUM_SIZE:
+        return Response(content=body, media_type="application/json")
+    headers = {"Vary": "Accept-Encoding"}
+    encoding = negotiate(request.headers.get("accept-encoding", ""))
+    if encoding is not None:
+        body = store.encoded(encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def signup(store, activity_name: str, email: str):
+    try:
+        store.signup(activity_name, email)
+    except ActivityNotFoundError:
+        raise HTTPException(status_code=404, detail="Activity not found")
+    except ParticipantError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"message": f"Signed up {email} for {activity_name}"}
+
+
+def unregister(store, activity_name: str, email: str):
+    try:
+        store.unregister(activity_name, email)
+    except ActivityNotFoundError:
+        raise HTTPException(status_code=404, detail="Activity not found")
+    except ParticipantError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"message": f"Unregistered {email} from {activity_name}"}
+
+
+@router.get("/")
 def root():
     return RedirectResponse(url="/static/index.html")
 
 
-@app.get("/activities")
-def get_activities():
-    return activities
+@router.get("/activities")
+def get_activities(request: Request):
+    return list_activities(get_store(request), request)
+
+
+@router.get("/activities/stats")
+def get_activity_stats(request: Request,
+                       order: Literal["fullest", "emptiest"] = "fullest",
+                       limit: Optional[int] = Query(None, ge=1)):
+    """Occupancy, remaining seats and fill ratio per activity, without participant lists"""
+    return get_store(request).stats(order, limit)
 
 
-@app.post("/activities/{activity_name}/signup")
-def signup_for_activity(activity_name: str, email: str):
+@router.post("/activities/{activity_name}/signup")
+def signup_for_activity(activity_name: str, email: str, request: Request):
     """Sign up a student for an activity"""
-    # Validate activity exists
-    if activity_name not in activities:
-        raise HTTPException(status_code=404, detail="Activity not found")
+    return signup(get_store(request), activity_name, email)
 
-    # Get the specific activity
-    activity = activities[activity_name]
 
-    # Validate student is not already signed up
-    if email in activity["participants"]:
-        raise HTTPException(status_code=400, detail="Student is already signed up")
+@router.delete("/activities/{activity_name}/participants/{email}")
+def unregister_from_activity(activity_name: str, email: str, request: Request):
+    """Unregister a student from an activity"""
+    return unregister(get_store(request), activity_name, email)
 
-    # Add student
-    activity["participants"].append(email)
-    return {"message": f"Signed up {email} for {activity_name}"}
 
+@router.get("/schools")
+def get_schools(request: Request):
+    """List the schools served by this instance"""
+    return {store.school_id: {"name": store.name} for store in request.app.state.schools}
 
-@app.delete("/activities/{activity_name}/participants/{email}")
-def unregister_from_activity(activity_name: str, email: str):
-    """Unregister a student from an activity"""
-    # Validate activity exists
-    if activity_name not in activities:
-        raise HTTPException(status_code=404, detail="Activity not found")
 
-    # Get the specific activity
-    activity = activities[activity_name]
+@router.get("/schools/{school_id}/activities")
+def get_school_activities(school_id: str, request: Request):
+    return list_activities(get_store(request, school_id), request)
 
-    # Validate student is registered
-    if email not in activity["participants"]:
-        raise HTTPException(status_code=400, detail="Student is not registered for this activity")
 
-    # Remove student
-    activity["participants"].remove(email)
-    return {"message": f"Unregistered {email} from {activity_name}"}
+@router.get("/schools/{school_id}/activities/stats")
+def get_school_activity_stats(school_id: str, request: Request,
+                              order: Literal["fullest", "emptiest"] = "fullest",
+                              limit: Optional[int] = Query(None, ge=1)):
+    """Occupancy summary for one school's activities"""
+    return get_store(request, school_id).stats(order, limit)
+
+
+@router.post("/schools/{school_id}/activities/{activity_name}/signup")
+def signup_for_school_activity(school_id: str, activity_name: str, email: str,
+                               request: Request):
+    """Sign up a student for an activity at a specific school"""
+    return signup(get_store(request, school_id), activity_name, email)
+
+
+@router.delete("/schools/{school_id}/activities/{activity_name}/participants/{email}")
+def unregister_from_school_activity(school_id: str, activity_name: str, email: str,
+                                    request: Request):
+    """Unregister a student from an activity at a specific school"""
+    return unregister(get_store(request, school_id), activity_name, email)
+
+
+def audit_history(store, email, since, until, after, limit):
+    if store.audit is None:
+        raise HTTPException(status_code=404, detail="Audit log is not enabled")
+    events, next_cursor = store.audit.query(email=email, since=since, until=until,
+                                            after=after, limit=limit)
+    return {"events": events, "next": next_cursor}
+
+
+@router.get("/audit")
+def get_audit_log(request: Request,
+                  email: Optional[str] = None,
+                  since: Optional[float] = None,
+                  until: Optional[float] = None,
+                  after: int = Query(0, ge=0),
+                  limit: int = Query(50, ge=1, le=500)):
+    """Page through the default school's signup/unregister history, oldest first
+
+    since/until are Unix timestamps; pass the returned "next" value as
+    "after" to fetch the following page.
+    """
+    return audit_history(get_store(request), email, since, until, after, limit)
+
+
+@router.get("/schools/{school_id}/audit")
+def get_school_audit_log(school_id: str, request: Request,
+                         email: Optional[str] = None,
+                         since: Optional[float] = None,
+                         until: Optional[float] = None,
+                         after: int = Query(0, ge=0),
+                         limit: int = Query(50, ge=1, le=500)):
+    """Page through one school's signup/unregister history, oldest first"""
+    return audit_history(get_store(request, school_id), email, since, until, after, limit)
+
+
+def create_app(audit_dir=None, school_config=None, worker_index=0, worker_count=1):
+    """Build an app instance with its own school registry
+
+    Every instance is fully isolated, so tests can create one per test and
+    run in parallel. school_config maps school ids to {"name", "activities"}
+    (default: Mergington only); the instance keeps only the schools that
+    worker_for() assigns to worker_index, so a district can be split across
+    worker_count processes. When audit_dir is given, those schools' audit
+    logs are opened there on startup and closed on shutdown, never at
+    import time.
+    """
+    if not 0 <= worker_index < worker_count:
+        raise ValueError(f"worker_index must be in [0, {worker_count})")
+    if school_config is None:
+        school_config = default_schools
+
+    @asynccontextmanager
+    async def lifespan(app):
+        if audit_dir is not None:
+            app.state.schools.open_audit(audit_dir)
+        try:
+            yield
+        finally:
+            app.state.schools.close()
+
+    app = FastAPI(title="Mergington High School API",
+                  description="API for viewing and signing up for extracurricular activities",
+                  lifespan=lifespan)
+
+    # Compress JSON and static responses for clients that accept gzip/brotli
+    app.add_middleware(CompressionMiddleware, minimum_size=MINIMUM_SIZE)
+
+    # Mount the static files directory
+    app.mount("/static", StaticFiles(directory=os.path.join(current_dir, "static")),
+              name="static")
+
+    app.state.school_workers = {school_id: worker_for(school_id, worker_count)
+                                for school_id in school_config}
+    app.state.schools = SchoolRegistry()
+    for school_id, school in school_config.items():
+        if app.state.school_workers[school_id] == worker_index:
+            app.state.schools.add(school_id, school["name"], school.get("activities", {}))
+    app.include_router(router)
+    return app
+
+
+# Deployment settings come from the environment: SCHOOLS_FILE for the
+# district, SCHOOL_WORKER_INDEX/SCHOOL_WORKER_COUNT when each process serves
+# one partition of it, and AUDIT_LOG_DIR for the per-school audit logs
+app = create_app(
+    audit_dir=os.environ.get("AUDIT_LOG_DIR", os.path.join(current_dir.parent, "audit_log")),
+    school_config=(load_school_config(os.environ["SCHOOLS_FILE"])
+                   if os.environ.get("SCHOOLS_FILE") else None),
+    worker_index=int(os.environ.get("SCHOOL_WORKER_INDEX", "0")),
+    worker_count=int(os.environ.get("SCHOOL_WORKER_COUNT", "1")),
+)
+schools = app.state.schools
@@ -0,0 +1,191 @@
+"""
+Append-only audit log of participant changes
+
+Events are written as compact JSON lines to numbered segment files that are
+rotated once they reach a size limit. A time index and an email index map
+each event's sequence number to its segment and byte offset, so a history
+query seeks straight to the matching lines instead of scanning segments.
+
+A directory has a single writer: opening it takes an exclusive lock, so a
+second process (or AuditLog) on the same directory fails immediately
+rather than interleaving sequence numbers.
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".log"
+LOCK_NAME = ".lock"
+
+
+class AuditLogLockedError(RuntimeError):
+    """Raised when another writer already holds an audit log directory"""
+
+
+class AuditLog:
+    """Segment-rotated event log stored under a single directory"""
+
+    def __init__(self, directory, max_segment_bytes=1024 * 1024):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self._lock = threading.Lock()
+        # Position i holds event seq i + 1; timestamps never decrease
+        self._positions = []
+        self._times = []
+        self._by_email = {}
+        self._segment = 0
+        self._segment_bytes = 0
+        self._file = None
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = self._acquire_directory()
+        try:
+            self._rebuild_indexes()
+        except BaseException:
+            self._lock_file.close()
+            raise
+
+    def _acquire_directory(self):
+        # Held for the log's lifetime; must be taken before the torn-write
+        # repair in _rebuild_indexes touches any segment
+        lock_file = open(os.path.join(self.directory, LOCK_NAME), "ab")
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                raise AuditLogLockedError(
+                    f"Audit log {self.directory!r} is already open by another writer; "
+                    "only the process that owns a school may open its log") from None
+        return lock_file
+
+    def _segment_path(self, segment):
+        return os.path.join(self.directory, f"{SEGMENT_PREFIX}{segment:06d}{SEGMENT_SUFFIX}")
+
+    def _rebuild_indexes(self):
+        # Only run on startup: a full read of existing segments
+        segments = sorted(
+            int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+            for name in os.listdir(self.directory)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        )
+        for segment in segments:
+            offset = 0
+            with open(self._segment_path(segment), "r+b") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        f.truncate(offset)  # drop a torn write from a crash
+                        break
+                    event = json.loads(line)
+                    self._index(event["email"], event["ts"], segment, offset)
+                    offset += len(line)
+            self._segment, self._segment_bytes = segment, offset
+        if not segments:
+            self._segment = 1
+        self._file = open(self._segment_path(self._segment), "ab")
+
+    def _index(self, email, ts, segment, offset):
+        # An event's seq is its line position across segments, never the
+        # value stored in the line, so the indexes cannot disagree
+        if self._times and ts < self._times[-1]:
+            ts = self._times[-1]  # keep the time index sorted
+        self._positions.append((segment, offset))
+        self._times.append(ts)
+        self._by_email.setdefault(email, []).append(len(self._positions))
+
+    def append(self, action, school_id, activity_name, email):
+        """Record a mutation and return the stored event"""
+        with self._lock:
+            ts = time.time()
+            if self._times and ts < self._times[-1]:
+                ts = self._times[-1]  # keep stored times in step with the index
+            event = {"seq": len(self._positions) + 1, "ts": ts, "action": action,
+                     "school": school_id, "activity": activity_name, "email": email}
+            line = json.dumps(event, separators=(",", ":")).encode("utf-8") + b"\n"
+            if self._segment_bytes and self._segment_bytes + len(line) > self.max_segment_bytes:
+                self._file.close()
+                self._segment += 1
+                self._segment_bytes = 0
+                self._file = open(self._segment_path(self._segment), "ab")
+            self._file.write(line)
+            self._file.flush()
+            self._index(email, ts, self._segment, self._segment_bytes)
+            self._segment_bytes += len(line)
+            return event
+
+    def __len__(self):
+        return len(self._positions)
+
+    def query(self, email=None, since=None, until=None, after=0, limit=50):
+        """Return up to limit events matching the filters, oldest first
+
+        ``after`` is the seq of the last event already seen; the second
+        return value is the cursor for the next page, or None.
+        """
+        with self._lock:
+            if email is not None:
+                seqs = self._by_email.get(email, [])
+                start = bisect.bisect_right(seqs, after)
+                if since is not None:
+                    # seqs are in time order, so skip straight past older events
+                    start = max(start, bisect.bisect_left(
+                        seqs, since, key=lambda seq: self._times[seq - 1]))
+                candidates = (seqs[i] for i in range(start, len(seqs)))
+            else:
+                start = after
+                if since is not None:
+                    start = max(start, bisect.bisect_left(self._times, since))
+                candidates = range(start + 1, len(self._positions) + 1)
+
+            matched = []
+            for seq in candidates:
+                if until is not None and self._times[seq - 1] > until:
+                    break
+                matched.append(seq)
+                if len(matched) > limit:
+                    break
+            more = len(matched) > limit
+            matched = matched[:limit]
+            positions = [self._positions[seq - 1] for seq in matched]
+
+        events = self._read(matched, positions)
+        return events, (matched[-1] if more else None)
+
+    def _read(self, seqs, positions):
+        events = []
+        handles = {}
+        try:
+            for seq, (segment, offset) in zip(seqs, positions):
+                f = handles.get(segment)
+                if f is None:
+                    f = handles[segment] = open(self._segment_path(segment), "rb")
+                f.seek(offset)
+                event = json.loads(f.readline())
+                event["seq"] = seq  # the position is authoritative
+                events.append(event)
+        finally:
+            for f in handles.values():
+                f.close()
+        return events
+
+    def close(self):
+        """Close the active segment and release the directory lock"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                self._lock_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
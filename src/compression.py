@@ -0,0 +1,181 @@
+"""
+Negotiated gzip/brotli response compression
+
+CompressionMiddleware compresses any buffered response above a size
+threshold. Brotli is used when the optional ``brotli`` package is installed
+and the client accepts it; otherwise gzip is used.
+"""
+
+import gzip
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Below this many bytes the encoding overhead outweighs the savings
+MINIMUM_SIZE = 500
+
+# Per-request compression favours speed. Cached catalogs are compressed a
+# little harder, but every signup clears that cache, so stay well below the
+# slow levels (brotli 10-11) meant for precompressed static assets
+FAST_LEVELS = {"br": 4, "gzip": 6}
+CACHED_LEVELS = {"br": 5, "gzip": 9}
+
+
+def supported_encodings():
+    """Return the encodings this server can produce, most preferred first"""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def negotiate(accept_encoding):
+    """Pick the best supported encoding for an Accept-Encoding header, or None"""
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding] = q
+
+    best, best_q = None, 0.0
+    for coding in supported_encodings():
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body, encoding, cached=False):
+    """Compress body with the given content-coding"""
+    level = (CACHED_LEVELS if cached else FAST_LEVELS)[encoding]
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    # mtime=0 keeps the output identical for identical input
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def encoded_etag(etag, encoding):
+    """Give a compressed representation its own ETag, e.g. "abc" -> "abc-gzip"
+
+    Sharing the identity ETag would let a cache hand one encoding to a
+    client that asked for the other.
+    """
+    suffix = b"-" + encoding.encode("latin-1")
+    if etag.endswith(b'"'):
+        return etag[:-1] + suffix + b'"'
+    return etag + suffix
+
+
+def strip_encoded_etags(header, encoding):
+    """Turn ETags from encoded_etag() back into the identity ETags
+
+    Returns the rewritten If-None-Match value and whether any tag carried
+    the suffix, so the inner app can compare against its own ETags.
+    """
+    suffix = b"-" + encoding.encode("latin-1") + b'"'
+    tags, stripped = [], False
+    for tag in header.split(b","):
+        tag = tag.strip()
+        if tag.endswith(suffix):
+            tag = tag[:-len(suffix)] + b'"'
+            stripped = True
+        tags.append(tag)
+    return b", ".join(tags), stripped
+
+
+class CompressionMiddleware:
+    """ASGI middleware that compresses complete responses on the way out
+
+    Only complete 200 responses are compressed. Responses that already carry
+    a Content-Encoding (such as the cached activity catalogs), range
+    responses and streamed responses are passed through untouched.
+    """
+
+    def __init__(self, app, minimum_size=MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        accept = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = negotiate(accept)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        # Revalidation of a compressed copy sends back its suffixed ETag;
+        # the inner app only knows the identity ETag
+        revalidating_encoded = False
+        headers = []
+        for name, value in scope["headers"]:
+            if name == b"if-none-match":
+                value, stripped = strip_encoded_etags(value, encoding)
+                revalidating_encoded = revalidating_encoded or stripped
+            headers.append((name, value))
+        if revalidating_encoded:
+            scope = dict(scope, headers=headers)
+
+        start = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                if message["status"] == 304 and revalidating_encoded:
+                    # Confirm the compressed copy the client actually holds
+                    message = dict(message, headers=[
+                        (name, encoded_etag(value, encoding) if name == b"etag" else value)
+                        for name, value in message["headers"]])
+                start = message
+                # Partial (206) and other non-200 bodies are left alone: a
+                # Content-Range cannot describe a compressed copy
+                if message["status"] != 200 or any(
+                        name in (b"content-encoding", b"content-range")
+                        for name, _ in message["headers"]):
+                    passthrough = True
+                    await send(message)
+                return
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] != "http.response.body" or message.get("more_body", False):
+                # Streamed or file-sent response: send it as-is
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+
+            headers = [(name, value) for name, value in start["headers"]
+                       if name not in (b"content-length", b"vary", b"etag")]
+            vary = [value for name, value in start["headers"] if name == b"vary"]
+            etags = [value for name, value in start["headers"] if name == b"etag"]
+            if len(body) >= self.minimum_size:
+                body = compress(body, encoding)
+                headers.append((b"content-encoding", encoding.encode("latin-1")))
+                vary.append(b"Accept-Encoding")
+                etags = [encoded_etag(etag, encoding) for etag in etags]
+            headers.extend((b"etag", etag) for etag in etags)
+            if vary:
+                headers.append((b"vary", b", ".join(vary)))
+            headers.append((b"content-length", str(len(body)).encode("latin-1")))
+            await send({**start, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,314 @@
+"""
+In-memory activity storage, sharded by school
+
+Every school in the district gets its own ActivityStore with a private lock,
+a version counter and a cached copy of its serialized activity catalog, so a
+signup rush at one school never contends with or invalidates another school.
+"""
+
+import bisect
+import json
+import os
+import threading
+import zlib
+
+try:
+    from .audit import AuditLog
+    from .compression import compress
+except ImportError:
+    from audit import AuditLog
+    from compression import compress
+
+
+class ActivityNotFoundError(LookupError):
+    """Raised when an activity does not exist in a school's catalog"""
+
+
+class ParticipantError(ValueError):
+    """Raised when a signup or removal conflicts with the participant list"""
+
+
+def serialize(data):
+    """Encode data as compact JSON, matching FastAPI's JSONResponse output"""
+    return json.dumps(data, ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def copy_catalog(activities):
+    """Copy a catalog, duplicating only the mutable participant lists
+
+    Much cheaper than copy.deepcopy since every other field is immutable.
+    """
+    return {name: dict(details, participants=list(details["participants"]))
+            for name, details in activities.items()}
+
+
+def worker_for(school_id, worker_count):
+    """Return the worker process index that owns a school's shard
+
+    Uses CRC32 rather than hash() so every process agrees on the mapping.
+    """
+    return zlib.crc32(school_id.encode("utf-8")) % worker_count
+
+
+class ActivityStore:
+    """Activities and participants for a single school"""
+
+    def __init__(self, school_id, name, activities=None, audit=None):
+        self.school_id = school_id
+        self.name = name
+        self.audit = audit
+        self.activities = {}
+        self.version = 0
+        self.lock = threading.RLock()
+        self._cache_version = None
+        self._cache_body = None
+        self._cache_encoded = {}
+        # Occupancy counters plus a (fill_ratio, name) index kept sorted
+        # emptiest-first, both updated incrementally on every mutation
+        self._occupancy = {}
+        self._by_fill = []
+        self._total_occupancy = 0
+        self._total_remaining = 0
+        self._total_capacity = 0
+        if activities is not None:
+            self.load(activities)
+
+    def _bump(self):
+        # Must be called with the lock held; drops this shard's cached body
+        self.version += 1
+        self._cache_version = None
+        self._cache_body = None
+        self._cache_encoded = {}
+
+    def _record(self, action, activity_name, email):
+        # Written under the store lock, before the change is applied, so log
+        # order matches mutation order and no change goes unrecorded
+        if self.audit is not None:
+            self.audit.append(action, self.school_id, activity_name, email)
+
+    def _fill_ratio(self, activity_name):
+        capacity = self.activities[activity_name]["max_participants"]
+        return self._occupancy[activity_name] / capacity if capacity else 1.0
+
+    def _remaining(self, activity_name):
+        capacity = self.activities[activity_name]["max_participants"]
+        return max(capacity - self._occupancy[activity_name], 0)
+
+    def _rebuild_stats(self):
+        self._occupancy = {name: len(details["participants"])
+                           for name, details in self.activities.items()}
+        self._by_fill = sorted((self._fill_ratio(name), name) for name in self.activities)
+        self._total_occupancy = sum(self._occupancy.values())
+        self._total_remaining = sum(self._remaining(name) for name in self.activities)
+        self._total_capacity = sum(details["max_participants"]
+                                   for details in self.activities.values())
+
+    def _adjust_occupancy(self, activity_name, delta):
+        # Must be called with the lock held
+        del self._by_fill[bisect.bisect_left(
+            self._by_fill, (self._fill_ratio(activity_name), activity_name))]
+        self._total_remaining -= self._remaining(activity_name)
+        self._occupancy[activity_name] += delta
+        self._total_occupancy += delta
+        self._total_remaining += self._remaining(activity_name)
+        bisect.insort(self._by_fill, (self._fill_ratio(activity_name), activity_name))
+
+    def load(self, activities):
+        """Replace the whole catalog in place with a copy of activities"""
+        with self.lock:
+            self.activities.clear()
+            self.activities.update(copy_catalog(activities))
+            self._rebuild_stats()
+            self._bump()
+
+    def add_activity(self, activity_name, details):
+        """Add a new activity to the catalog
+
+        Always go through the store rather than editing ``activities``
+        directly, so the occupancy counters and caches stay in step.
+        """
+        with self.lock:
+            if activity_name in self.activities:
+                raise ValueError(f"Activity {activity_name!r} already exists")
+            self.activities[activity_name] = copy_catalog({activity_name: details})[activity_name]
+            self._occupancy[activity_name] = len(details["participants"])
+            self._total_occupancy += self._occupancy[activity_name]
+            self._total_remaining += self._remaining(activity_name)
+            self._total_capacity += details["max_participants"]
+            bisect.insort(self._by_fill, (self._fill_ratio(activity_name), activity_name))
+            self._bump()
+
+    def snapshot(self):
+        """Return an independent copy of the catalog for a later restore()"""
+        with self.lock:
+            return copy_catalog(self.activities)
+
+    def restore(self, snapshot):
+        """Roll the catalog back to a snapshot; the audit log is not rewound
+
+        The snapshot is copied, so it can be restored any number of times.
+        """
+        self.load(snapshot)
+
+    def serialized(self):
+        """Return the catalog as JSON bytes, reusing the cache while unchanged"""
+        with self.lock:
+            if self._cache_version != self.version:
+                self._cache_body = serialize(self.activities)
+                self._cache_version = self.version
+            return self._cache_body
+
+    def encoded(self, encoding):
+        """Return the catalog compressed with encoding, cached per version
+
+        Compression runs outside the lock so it never holds up signups; the
+        result is cached only if no mutation happened in the meantime.
+        """
+        with self.lock:
+            cached = self._cache_encoded.get(encoding)
+            if cached is not None:
+                return cached
+            body = self.serialized()
+            version = self.version
+        data = compress(body, encoding, cached=True)
+        with self.lock:
+            if self.version == version:
+                return self._cache_encoded.setdefault(encoding, data)
+        return data
+
+    def _fullest_first(self):
+        # _by_fill is sorted by (ratio, name); walk the ratios from highest to
+        # lowest but keep each run of tied ratios in name order, as for emptiest
+        end = len(self._by_fill)
+        while end:
+            start = bisect.bisect_left(self._by_fill, (self._by_fill[end - 1][0],), 0, end)
+            yield from self._by_fill[start:end]
+            end = start
+
+    def stats(self, order="fullest", limit=None):
+        """Return occupancy per activity, fullest or emptiest first, plus totals
+
+        Activities with the same fill ratio are listed by name in both orders.
+
+        Reads the precomputed counters, so no participant list is scanned.
+        """
+        with self.lock:
+            index = self._fullest_first() if order == "fullest" else iter(self._by_fill)
+            rows = []
+            for fill_ratio, name in index:
+                if limit is not None and len(rows) >= limit:
+                    break
+                rows.append({"name": name, "occupancy": self._occupancy[name],
+                             "max_participants": self.activities[name]["max_participants"],
+                             "remaining": self._remaining(name),
+                             "fill_ratio": fill_ratio})
+            capacity = self._total_capacity
+            totals = {"occupancy": self._total_occupancy, "max_participants": capacity,
+                      "remaining": self._total_remaining,
+                      "fill_ratio": self._total_occupancy / capacity if capacity else 0.0}
+            return {"totals": totals, "activities": rows}
+
+    def signup(self, activity_name, email):
+        """Add email to an activity's participants"""
+        with self.lock:
+            if activity_name not in self.activities:
+                raise ActivityNotFoundError(activity_name)
+            participants = self.activities[activity_name]["participants"]
+            if email in participants:
+                raise ParticipantError("Student is already signed up")
+            # Log first: if the write fails, nothing is changed either
+            self._record("signup", activity_name, email)
+            participants.append(email)
+            self._adjust_occupancy(activity_name, 1)
+            self._bump()
+
+    def unregister(self, activity_name, email):
+        """Remove email from an activity's participants"""
+        with self.lock:
+            if activity_name not in self.activities:
+                raise ActivityNotFoundError(activity_name)
+            participants = self.activities[activity_name]["participants"]
+            if email not in participants:
+                raise ParticipantError("Student is not registered for this activity")
+            self._record("unregister", activity_name, email)
+            participants.remove(email)
+            self._adjust_occupancy(activity_name, -1)
+            self._bump()
+
+
+class SchoolRegistry:
+    """Maps school ids to their ActivityStore shards
+
+    When audit_dir is set (at construction or via open_audit()), each shard
+    keeps its own audit log in a subdirectory named after the school until
+    close() is called.
+    """
+
+    def __init__(self, audit_dir=None):
+        self.audit_dir = audit_dir
+        self._stores = {}
+        self._lock = threading.Lock()
+
+    def add(self, school_id, name, activities=None):
+        """Create and register a shard for a school"""
+        with self._lock:
+            if school_id in self._stores:
+                raise ValueError(f"School {school_id!r} is already registered")
+            audit = None
+            if self.audit_dir is not None:
+                audit = AuditLog(os.path.join(self.audit_dir, school_id))
+            store = ActivityStore(school_id, name, activities, audit)
+            self._stores[school_id] = store
+        return store
+
+    def open_audit(self, audit_dir):
+        """Open an audit log for every shard, and for shards added later"""
+        with self._lock:
+            self.audit_dir = audit_dir
+            try:
+                for store in self._stores.values():
+                    if store.audit is None:
+                        store.audit = AuditLog(os.path.join(audit_dir, store.school_id))
+            except BaseException:
+                self._close_audit()
+                raise
+
+    def close(self):
+        """Close every shard's audit log; safe to call more than once"""
+        with self._lock:
+            self._close_audit()
+
+    def _close_audit(self):
+        # Must be called with the lock held
+        self.audit_dir = None
+        for store in self._stores.values():
+            if store.audit is not None:
+                store.audit.close()
+                store.audit = None
+
+    def remove(self, school_id):
+        with self._lock:
+            store = self._stores.pop(school_id)
+        if store.audit is not None:
+            store.audit.close()
+        return store
+
+    def get(self, school_id):
+        """Return a school's shard, raising KeyError if it is unknown"""
+        return self._stores[school_id]
+
+    def __contains__(self, school_id):
+        return school_id in self._stores
+
+    def __iter__(self):
+        return iter(list(self._stores.values()))
+
+    def snapshot(self):
+        """Snapshot every school's catalog, keyed by school id"""
+        return {store.school_id: store.snapshot() for store in self}
+
+    def restore(self, snapshot):
+        """Restore the schools captured in a snapshot()"""
+        for school_id, activities in snapshot.items():
+            self.get(school_id).restore(activities)
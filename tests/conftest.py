@@ -1,5 +1,8 @@
 """
 Test configuration and fixtures for FastAPI tests
+
+Every test gets its own app instance from create_app(), so no state is
+shared between tests and the suite can run in parallel (pytest -n auto).
 """
 import pytest
 from fastapi.testclient import TestClient
@@ -9,78 +12,44 @@ import os
 # Add the src directory to the Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from app import app, activities
+from app import create_app, DEFAULT_SCHOOL
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Create an isolated app instance with a private audit log directory"""
+    app = create_app(audit_dir=str(tmp_path / "audit"))
+    yield app
+    app.state.schools.close()
+
+
+@pytest.fixture
+def client(app):
+    """Create a test client for the per-test app, running its startup/shutdown"""
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def schools(app):
+    """The per-test app's school registry"""
+    return app.state.schools
 
 
 @pytest.fixture
-def client():
-    """Create a test client for the FastAPI app"""
-    return TestClient(app)
+def activities(schools):
+    """The default school's activity catalog in the per-test app"""
+    return schools.get(DEFAULT_SCHOOL).activities
 
 
 @pytest.fixture
-def reset_activities():
-    """Reset activities data to initial state after each test"""
-    # Store original activities data
-    original_activities = {
+def other_school(schools):
+    """Register a second school shard in the per-test app"""
+    return schools.add("riverside", "Riverside Middle School", {
         "Chess Club": {
             "description": "Learn strategies and compete in chess tournaments",
-            "schedule": "Fridays, 3:30 PM - 5:00 PM",
-            "max_participants": 12,
-            "participants": ["michael@mergington.edu", "daniel@mergington.edu"]
-        },
-        "Programming Class": {
-            "description": "Learn programming fundamentals and build software projects",
-            "schedule": "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
-            "max_participants": 20,
-            "participants": ["emma@mergington.edu", "sophia@mergington.edu"]
-        },
-        "Gym Class": {
-            "description": "Physical education and sports activities",
-            "schedule": "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
-            "max_participants": 30,
-            "participants": ["john@mergington.edu", "olivia@mergington.edu"]
-        },
-        "Soccer Team": {
-            "description": "Join the school soccer team and compete in matches",
-            "schedule": "Wednesdays, 4:00 PM - 5:30 PM",
-            "max_participants": 22,
-            "participants": ["lucas@mergington.edu", "mia@mergington.edu"]
-        },
-        "Basketball Club": {
-            "description": "Practice basketball skills and play friendly games",
-            "schedule": "Mondays, 3:30 PM - 5:00 PM",
-            "max_participants": 15,
-            "participants": ["liam@mergington.edu", "ava@mergington.edu"]
-        },
-        "Art Workshop": {
-            "description": "Explore painting, drawing, and sculpture techniques",
-            "schedule": "Thursdays, 4:00 PM - 5:30 PM",
-            "max_participants": 18,
-            "participants": ["ella@mergington.edu", "noah@mergington.edu"]
-        },
-        "Drama Club": {
-            "description": "Act, direct, and produce school plays and performances",
-            "schedule": "Tuesdays, 3:30 PM - 5:00 PM",
-            "max_participants": 20,
-            "participants": ["jack@mergington.edu", "grace@mergington.edu"]
-        },
-        "Math Olympiad": {
-            "description": "Prepare for math competitions and solve challenging problems",
-            "schedule": "Fridays, 4:00 PM - 5:30 PM",
-            "max_participants": 16,
-            "participants": ["oliver@mergington.edu", "chloe@mergington.edu"]
-        },
-        "Science Club": {
-            "description": "Conduct experiments and explore scientific concepts",
-            "schedule": "Wednesdays, 3:30 PM - 5:00 PM",
-            "max_participants": 20,
-            "participants": ["benjamin@mergington.edu", "zoe@mergington.edu"]
+            "schedule": "Mondays, 3:00 PM - 4:00 PM",
+            "max_participants": 10,
+            "participants": ["amy@riverside.edu"]
         }
-    }
-    
-    yield
-    
-    # Reset activities to original state after test
-    activities.clear()
-    activities.update(original_activities)
\ No newline at end of file
+    })
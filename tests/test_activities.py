@@ -8,7 +8,7 @@ from fastapi import status
 class TestActivitiesEndpoints:
     """Test class for activities-related endpoints"""
 
-    def test_get_activities_success(self, client, reset_activities):
+    def test_get_activities_success(self, client):
         """Test successful retrieval of all activities"""
         response = client.get("/activities")
         
@@ -31,7 +31,7 @@ class TestActivitiesEndpoints:
         assert "participants" in chess_club
         assert isinstance(chess_club["participants"], list)
 
-    def test_get_activities_structure(self, client, reset_activities):
+    def test_get_activities_structure(self, client):
         """Test that activities have the correct structure"""
         response = client.get("/activities")
         data = response.json()
@@ -57,7 +57,7 @@ class TestActivitiesEndpoints:
             # Check that participants don't exceed max
             assert len(activity_data["participants"]) <= activity_data["max_participants"]
 
-    def test_activities_count(self, client, reset_activities):
+    def test_activities_count(self, client):
         """Test that we have the expected number of activities"""
         response = client.get("/activities")
         data = response.json()
@@ -0,0 +1,253 @@
+"""
+Tests for the audit log and the GET /audit endpoint
+"""
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from app import create_app
+from audit import AuditLog, AuditLogLockedError
+from store import worker_for
+
+
+class TestAuditEndpoint:
+    """Test class for the audit history endpoint"""
+
+    def test_mutations_are_recorded(self, client):
+        """Test that signups and removals show up in the audit history"""
+        email = "audit.trail@mergington.edu"
+        client.post(f"/activities/Chess Club/signup?email={email}")
+        client.delete(f"/activities/Chess Club/participants/{email}")
+
+        response = client.get(f"/audit?email={email}")
+
+        assert response.status_code == status.HTTP_200_OK
+        events = response.json()["events"]
+        assert [event["action"] for event in events][-2:] == ["signup", "unregister"]
+        assert all(event["activity"] == "Chess Club" for event in events)
+        assert all(event["school"] == "mergington" for event in events)
+
+    def test_failed_mutations_are_not_recorded(self, client):
+        """Test that rejected requests leave no audit entry"""
+        email = "never.registered@mergington.edu"
+        client.delete(f"/activities/Chess Club/participants/{email}")
+
+        response = client.get(f"/audit?email={email}")
+
+        assert response.json() == {"events": [], "next": None}
+
+    def test_audit_is_per_school(self, client, other_school):
+        """Test that each school has its own audit history"""
+        email = "riverside.only@riverside.edu"
+        client.post(f"/schools/riverside/activities/Chess Club/signup?email={email}")
+
+        assert client.get(f"/audit?email={email}").json()["events"] == []
+        events = client.get(f"/schools/riverside/audit?email={email}").json()["events"]
+        assert events[-1]["school"] == "riverside"
+
+    def test_audit_alias_serves_default_school(self, client):
+        """Test that /audit matches the default school's scoped history"""
+        client.post("/activities/Chess Club/signup?email=alias@mergington.edu")
+
+        legacy = client.get("/audit").json()
+        scoped = client.get("/schools/mergington/audit").json()
+
+        assert legacy == scoped
+        assert legacy["events"][-1]["email"] == "alias@mergington.edu"
+
+    def test_audit_unknown_school(self, client):
+        """Test that auditing an unknown school returns 404"""
+        response = client.get("/schools/nowhere/audit")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_audit_limit_validation(self, client):
+        """Test that page sizes are bounded"""
+        assert client.get("/audit?limit=0").status_code == 422
+        assert client.get("/audit?limit=501").status_code == 422
+
+    def test_failed_audit_write_leaves_store_unchanged(self, schools, monkeypatch):
+        """Test that a mutation is not applied when its audit entry cannot be written"""
+        store = schools.get("mergington")
+
+        class BrokenLog:
+            def append(self, *args):
+                raise OSError("disk full")
+
+        monkeypatch.setattr(store, "audit", BrokenLog())
+        version = store.version
+        before = store.snapshot()
+
+        with pytest.raises(OSError):
+            store.signup("Chess Club", "lost@mergington.edu")
+        with pytest.raises(OSError):
+            store.unregister("Chess Club", "michael@mergington.edu")
+
+        assert store.snapshot() == before
+        assert store.version == version
+        assert store.stats()["totals"]["occupancy"] == sum(
+            len(details["participants"]) for details in before.values())
+
+
+class TestPartitionedAudit:
+    """Test audit logs shared by partitioned worker processes"""
+
+    def test_partitions_share_audit_dir(self, tmp_path):
+        """Test that every partition starts on one AUDIT_LOG_DIR and logs only its own schools"""
+        config = {f"school-{i}": {"name": f"School {i}", "activities": {}} for i in range(12)}
+        apps = [create_app(audit_dir=str(tmp_path), school_config=config,
+                           worker_index=index, worker_count=3) for index in range(3)]
+
+        with TestClient(apps[0]), TestClient(apps[1]), TestClient(apps[2]):
+            for index, app in enumerate(apps):
+                for store in app.state.schools:
+                    assert store.audit is not None
+                    assert worker_for(store.school_id, 3) == index
+
+        assert {path.name for path in tmp_path.iterdir()} == set(config)
+
+    def test_same_school_in_two_processes_fails_fast(self, tmp_path):
+        """Test that two unpartitioned instances cannot both write one school's log"""
+        with TestClient(create_app(audit_dir=str(tmp_path))):
+            with pytest.raises(AuditLogLockedError):
+                with TestClient(create_app(audit_dir=str(tmp_path))):
+                    pass
+
+
+class TestAuditLog:
+    """Test the segment-rotated audit log"""
+
+    def test_segments_rotate(self, tmp_path):
+        """Test that a full segment rolls over to a new file"""
+        log = AuditLog(str(tmp_path), max_segment_bytes=256)
+        for i in range(10):
+            log.append("signup", "mergington", "Chess Club", f"s{i}@mergington.edu")
+        log.close()
+
+        assert len(list(tmp_path.glob("segment-*.log"))) > 1
+
+    def test_paging_with_cursor(self, tmp_path):
+        """Test that pages follow on from the returned cursor"""
+        with AuditLog(str(tmp_path), max_segment_bytes=256) as log:
+            for i in range(7):
+                log.append("signup", "mergington", "Chess Club", f"s{i}@mergington.edu")
+
+            first, cursor = log.query(limit=3)
+            second, cursor = log.query(after=cursor, limit=3)
+            third, cursor = log.query(after=cursor, limit=3)
+
+            assert [e["seq"] for e in first + second + third] == list(range(1, 8))
+            assert cursor is None
+
+    def test_email_and_time_filters(self, tmp_path):
+        """Test filtering by email and time window"""
+        with AuditLog(str(tmp_path)) as log:
+            events = [log.append("signup", "mergington", name, email)
+                      for name, email in [("Chess Club", "a@m.edu"), ("Drama Club", "b@m.edu"),
+                                          ("Art Workshop", "a@m.edu")]]
+
+            by_email, _ = log.query(email="a@m.edu")
+            assert [e["activity"] for e in by_email] == ["Chess Club", "Art Workshop"]
+
+            windowed, _ = log.query(since=events[1]["ts"], until=events[1]["ts"])
+            assert events[1] in windowed
+            assert all(events[1]["ts"] == e["ts"] for e in windowed)
+
+            later, _ = log.query(email="a@m.edu", after=events[0]["seq"])
+            assert [e["seq"] for e in later] == [events[2]["seq"]]
+
+    def test_email_with_since_and_after(self, tmp_path):
+        """Test combining the email index with a time window and a cursor"""
+        with AuditLog(str(tmp_path)) as log:
+            events = [log.append("signup", "mergington", f"Club {i}",
+                                 "a@m.edu" if i % 2 == 0 else "b@m.edu")
+                      for i in range(8)]
+            a_events = [e for e in events if e["email"] == "a@m.edu"]
+
+            since_only, _ = log.query(email="a@m.edu", since=a_events[2]["ts"])
+            assert [e["seq"] for e in since_only] == [
+                e["seq"] for e in a_events if e["ts"] >= a_events[2]["ts"]]
+
+            # since later than the cursor: the time bound wins
+            windowed, _ = log.query(email="a@m.edu", since=a_events[2]["ts"],
+                                    after=a_events[0]["seq"])
+            assert [e["seq"] for e in windowed] == [e["seq"] for e in since_only]
+
+            # cursor later than since: the cursor wins
+            paged, _ = log.query(email="a@m.edu", since=a_events[0]["ts"],
+                                 after=a_events[2]["seq"])
+            assert [e["seq"] for e in paged] == [e["seq"] for e in a_events[3:]]
+
+            assert log.query(email="a@m.edu", since=events[-1]["ts"] + 1) == ([], None)
+
+    def test_filtered_paging_across_segments(self, tmp_path):
+        """Test paging an email filter through events spread over rotated segments"""
+        with AuditLog(str(tmp_path), max_segment_bytes=300) as log:
+            for i in range(30):
+                email = "target@m.edu" if i % 3 == 0 else f"other{i}@m.edu"
+                log.append("signup", "mergington", "Chess Club", email)
+            assert len(list(tmp_path.glob("segment-*.log"))) > 3
+
+            seen, cursor = [], 0
+            while True:
+                page, cursor = log.query(email="target@m.edu", after=cursor, limit=4)
+                seen.extend(page)
+                if cursor is None:
+                    break
+
+        assert [e["seq"] for e in seen] == list(range(1, 31, 3))
+        assert all(e["email"] == "target@m.edu" for e in seen)
+
+    def test_indexes_rebuilt_on_reopen(self, tmp_path):
+        """Test that a reopened log continues the sequence and keeps its indexes"""
+        log = AuditLog(str(tmp_path), max_segment_bytes=256)
+        for i in range(5):
+            log.append("signup", "mergington", "Chess Club", f"s{i}@mergington.edu")
+        log.close()
+
+        with AuditLog(str(tmp_path), max_segment_bytes=256) as reopened:
+            event = reopened.append("unregister", "mergington", "Chess Club", "s2@mergington.edu")
+
+            assert event["seq"] == 6
+            history, _ = reopened.query(email="s2@mergington.edu")
+            assert [e["action"] for e in history] == ["signup", "unregister"]
+
+    def test_torn_write_is_discarded(self, tmp_path):
+        """Test that a partial trailing line from a crash is dropped on reopen"""
+        log = AuditLog(str(tmp_path))
+        log.append("signup", "mergington", "Chess Club", "a@m.edu")
+        log.close()
+        segment = next(tmp_path.glob("segment-*.log"))
+        with open(segment, "ab") as f:
+            f.write(b'{"seq":2,"ts"')
+
+        with AuditLog(str(tmp_path)) as reopened:
+            reopened.append("signup", "mergington", "Drama Club", "b@m.edu")
+
+            events, _ = reopened.query()
+            assert [e["activity"] for e in events] == ["Chess Club", "Drama Club"]
+
+    def test_second_writer_fails_fast(self, tmp_path):
+        """Test that a directory can only be opened by one writer at a time"""
+        with AuditLog(str(tmp_path)) as log:
+            log.append("signup", "mergington", "Chess Club", "a@m.edu")
+            with pytest.raises(AuditLogLockedError):
+                AuditLog(str(tmp_path))
+
+        with AuditLog(str(tmp_path)) as reopened:
+            assert len(reopened) == 1
+
+    def test_seq_comes_from_line_position(self, tmp_path):
+        """Test that stored seq values are ignored when rebuilding the indexes"""
+        segment = tmp_path / "segment-000001.log"
+        lines = [
+            '{"seq":1,"ts":1.0,"action":"signup","school":"m","activity":"Chess Club","email":"a@m.edu"}',
+            '{"seq":1,"ts":2.0,"action":"signup","school":"m","activity":"Drama Club","email":"b@m.edu"}',
+            '{"seq":1,"ts":3.0,"action":"unregister","school":"m","activity":"Chess Club","email":"a@m.edu"}',
+        ]
+        segment.write_text("\n".join(lines) + "\n")
+
+        with AuditLog(str(tmp_path)) as log:
+            events, _ = log.query()
+            by_email, _ = log.query(email="a@m.edu", after=1)
+
+        assert [e["seq"] for e in events] == [1, 2, 3]
+        assert [(e["seq"], e["action"]) for e in by_email] == [(3, "unregister")]
@@ -0,0 +1,220 @@
+"""
+Tests for negotiated response compression
+"""
+import gzip
+import threading
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+import compression
+import store as store_module
+from compression import CompressionMiddleware, negotiate
+from app import DEFAULT_SCHOOL
+
+
+def raw_get(client, url, accept_encoding, **headers):
+    """GET url and return the response with its body still encoded"""
+    headers["Accept-Encoding"] = accept_encoding
+    with client.stream("GET", url, headers=headers) as response:
+        body = b"".join(response.iter_raw())
+    return response, body
+
+
+class TestActivitiesCompression:
+    """Test compression of the activity catalog"""
+
+    def test_gzip_catalog(self, client, schools):
+        """Test that gzip clients get the cached gzip body"""
+        response, body = raw_get(client, "/activities", "gzip")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-encoding"] == "gzip"
+        assert "accept-encoding" in response.headers["vary"].lower()
+        assert gzip.decompress(body) == schools.get(DEFAULT_SCHOOL).serialized()
+        assert body == schools.get(DEFAULT_SCHOOL).encoded("gzip")
+
+    def test_brotli_catalog(self, client, schools):
+        """Test that brotli is preferred when the client accepts it"""
+        brotli = pytest.importorskip("brotli")
+
+        response, body = raw_get(client, "/activities", "gzip, br")
+
+        assert response.headers["content-encoding"] == "br"
+        assert brotli.decompress(body) == schools.get(DEFAULT_SCHOOL).serialized()
+
+    def test_identity_catalog(self, client, schools):
+        """Test that clients without Accept-Encoding get plain JSON"""
+        response, body = raw_get(client, "/activities", "identity")
+
+        assert "content-encoding" not in response.headers
+        assert body == schools.get(DEFAULT_SCHOOL).serialized()
+
+    def test_compressed_cache_follows_version(self, client, schools):
+        """Test that a mutation replaces the cached compressed body"""
+        store = schools.get(DEFAULT_SCHOOL)
+        before = store.encoded("gzip")
+        assert store.encoded("gzip") is before
+
+        client.post("/activities/Chess Club/signup?email=zipped@mergington.edu")
+
+        _, body = raw_get(client, "/activities", "gzip")
+        assert b"zipped@mergington.edu" in gzip.decompress(body)
+        assert body != before
+        assert store.encoded("gzip") is not before
+
+    def test_compression_runs_outside_store_lock(self, schools, monkeypatch):
+        """Test that compressing the catalog does not block the store lock"""
+        store = schools.get(DEFAULT_SCHOOL)
+        acquired = []
+
+        def try_lock():
+            if store.lock.acquire(timeout=1):
+                store.lock.release()
+                acquired.append(True)
+
+        def compress_with_probe(body, encoding, cached=False):
+            # Another thread (a signup) must be able to take the lock here
+            probe = threading.Thread(target=try_lock)
+            probe.start()
+            probe.join()
+            return compression.compress(body, encoding, cached)
+
+        monkeypatch.setattr(store_module, "compress", compress_with_probe)
+        store.encoded("gzip")
+
+        assert acquired == [True]
+
+    def test_stale_compression_not_cached(self, schools, monkeypatch):
+        """Test that a body compressed before a mutation is not cached for the new version"""
+        store = schools.get(DEFAULT_SCHOOL)
+
+        def compress_during_signup(body, encoding, cached=False):
+            store.signup("Chess Club", "racer@mergington.edu")
+            return compression.compress(body, encoding, cached)
+
+        monkeypatch.setattr(store_module, "compress", compress_during_signup)
+        stale = store.encoded("gzip")
+        monkeypatch.undo()
+
+        assert b"racer@mergington.edu" not in gzip.decompress(stale)
+        assert b"racer@mergington.edu" in gzip.decompress(store.encoded("gzip"))
+
+
+class TestStaticCompression:
+    """Test compression of static files"""
+
+    def test_range_response_not_compressed(self, client):
+        """Test that 206 responses keep their Content-Range bytes uncompressed"""
+        response, body = raw_get(client, "/static/app.js", "gzip", Range="bytes=0-999")
+
+        assert response.status_code == status.HTTP_206_PARTIAL_CONTENT
+        assert "content-encoding" not in response.headers
+        assert response.headers["content-range"].startswith("bytes 0-999/")
+        assert len(body) == 1000
+
+    def test_compressed_etag_differs(self, client):
+        """Test that the gzip copy does not reuse the identity ETag"""
+        plain, _ = raw_get(client, "/static/app.js", "identity")
+        zipped, _ = raw_get(client, "/static/app.js", "gzip")
+
+        assert zipped.headers["content-encoding"] == "gzip"
+        assert zipped.headers["etag"] != plain.headers["etag"]
+        assert zipped.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+
+    def test_gzip_revalidation_not_modified(self, client):
+        """Test that sending back the gzip ETag gets a 304"""
+        zipped, _ = raw_get(client, "/static/app.js", "gzip")
+        etag = zipped.headers["etag"]
+
+        response, body = raw_get(client, "/static/app.js", "gzip", **{"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.headers["etag"] == etag
+        assert body == b""
+
+    def test_identity_etag_not_rewritten_on_304(self, client):
+        """Test that revalidating an uncompressed copy keeps the identity ETag"""
+        plain, _ = raw_get(client, "/static/app.js", "identity")
+        etag = plain.headers["etag"]
+
+        response, _ = raw_get(client, "/static/app.js", "gzip", **{"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.headers["etag"] == etag
+
+
+class TestCompressionMiddleware:
+    """Test the generic compression middleware"""
+
+    @pytest.fixture
+    def small_app_client(self):
+        def large(request):
+            return PlainTextResponse("x" * 1000)
+
+        def small(request):
+            return PlainTextResponse("tiny")
+
+        def streamed(request):
+            async def chunks():
+                for _ in range(3):
+                    yield b"y" * 1000
+            return StreamingResponse(chunks(), media_type="text/plain")
+
+        app = Starlette(routes=[Route("/large", large), Route("/small", small),
+                                Route("/streamed", streamed)])
+        app.add_middleware(CompressionMiddleware, minimum_size=500)
+        return TestClient(app)
+
+    def test_large_response_compressed(self, small_app_client):
+        """Test that responses above the threshold are compressed"""
+        response, body = raw_get(small_app_client, "/large", "gzip")
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert int(response.headers["content-length"]) == len(body)
+        assert gzip.decompress(body) == b"x" * 1000
+
+    def test_small_response_not_compressed(self, small_app_client):
+        """Test that responses below the threshold are sent as-is"""
+        response, body = raw_get(small_app_client, "/small", "gzip")
+
+        assert "content-encoding" not in response.headers
+        assert body == b"tiny"
+
+    def test_streamed_response_passed_through(self, small_app_client):
+        """Test that multi-chunk responses are sent uncompressed"""
+        response, body = raw_get(small_app_client, "/streamed", "gzip")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "content-encoding" not in response.headers
+        assert body == b"y" * 3000
+
+
+class TestNegotiation:
+    """Test Accept-Encoding negotiation"""
+
+    def test_gzip_only_without_brotli(self, monkeypatch):
+        """Test that brotli is never chosen when the package is missing"""
+        monkeypatch.setattr(compression, "brotli", None)
+
+        assert negotiate("br, gzip") == "gzip"
+        assert negotiate("br") is None
+
+    def test_quality_values(self, monkeypatch):
+        """Test that q-values and wildcards are honoured"""
+        monkeypatch.setattr(compression, "brotli", None)
+
+        assert negotiate("gzip;q=0") is None
+        assert negotiate("*") == "gzip"
+        assert negotiate("*, gzip;q=0") is None
+        assert negotiate("") is None
+
+    def test_malformed_quality_value(self, monkeypatch):
+        """Test that an unparsable q-value disables that coding"""
+        monkeypatch.setattr(compression, "brotli", None)
+
+        assert negotiate("gzip;q=abc") is None
+        assert negotiate("gzip;q=abc, *;q=0.5") is None
+        assert negotiate("br;q=oops, gzip") == "gzip"
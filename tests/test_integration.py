@@ -3,13 +3,12 @@ Integration tests for the complete application workflow
 """
 import pytest
 from fastapi import status
-from app import activities
 
 
 class TestIntegrationWorkflows:
     """Test complete user workflows"""
 
-    def test_complete_student_journey(self, client, reset_activities):
+    def test_complete_student_journey(self, client):
         """Test a complete student journey: view activities, sign up, view updated list, unregister"""
         student_email = "integration.test@mergington.edu"
         activity_name = "Drama Club"
@@ -52,7 +51,7 @@ class TestIntegrationWorkflows:
         assert student_email not in final_data[activity_name]["participants"]
         assert len(final_data[activity_name]["participants"]) == initial_count
 
-    def test_multiple_students_same_activity(self, client, reset_activities):
+    def test_multiple_students_same_activity(self, client):
         """Test multiple students signing up for the same activity"""
         activity_name = "Basketball Club"
         students = [
@@ -93,7 +92,7 @@ class TestIntegrationWorkflows:
         assert students[2] in final_data[activity_name]["participants"]
         assert len(final_data[activity_name]["participants"]) == initial_count + len(students) - 1
 
-    def test_student_multiple_activities(self, client, reset_activities):
+    def test_student_multiple_activities(self, client):
         """Test one student signing up for multiple activities"""
         student_email = "multi.activity@mergington.edu"
         activities_to_join = ["Science Club", "Math Olympiad", "Art Workshop"]
@@ -122,7 +121,7 @@ class TestIntegrationWorkflows:
         assert student_email in final_data[activities_to_join[1]]["participants"]
         assert student_email in final_data[activities_to_join[2]]["participants"]
 
-    def test_activity_capacity_tracking(self, client, reset_activities):
+    def test_activity_capacity_tracking(self, client):
         """Test that activity capacity is properly tracked"""
         # Find an activity with available spots
         response = client.get("/activities")
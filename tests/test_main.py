@@ -3,6 +3,8 @@ Tests for main application endpoints
 """
 import pytest
 from fastapi import status
+from fastapi.testclient import TestClient
+from app import create_app
 
 
 class TestMainEndpoints:
@@ -97,6 +99,40 @@ class TestApplicationInfo:
         assert "application/json" in response.headers.get("content-type", "").lower()
 
 
+class TestAppFactory:
+    """Test that create_app() builds isolated app instances"""
+
+    def test_apps_do_not_share_state(self, tmp_path):
+        """Test that a signup in one app instance is invisible to another"""
+        email = "isolated@mergington.edu"
+        with TestClient(create_app(audit_dir=str(tmp_path / "first"))) as first, \
+                TestClient(create_app(audit_dir=str(tmp_path / "second"))) as second:
+            response = first.post(f"/activities/Chess Club/signup?email={email}")
+            assert response.status_code == status.HTTP_200_OK
+
+            assert email in first.get("/activities").json()["Chess Club"]["participants"]
+            assert email not in second.get("/activities").json()["Chess Club"]["participants"]
+
+    def test_audit_disabled_without_directory(self):
+        """Test that /audit reports 404 when no audit directory is configured"""
+        with TestClient(create_app()) as client:
+            response = client.get("/audit")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_audit_log_follows_lifespan(self, tmp_path):
+        """Test that audit logs open on startup, not on create_app(), and close on shutdown"""
+        app = create_app(audit_dir=str(tmp_path / "audit"))
+        store = app.state.schools.get("mergington")
+        assert store.audit is None
+        assert not (tmp_path / "audit").exists()
+
+        with TestClient(app) as client:
+            assert store.audit is not None
+            assert client.get("/audit").status_code == status.HTTP_200_OK
+
+        assert store.audit is None
+
+
 class TestErrorHandling:
     """Test error handling and edge cases"""
 
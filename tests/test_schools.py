@@ -0,0 +1,196 @@
+"""
+Tests for school-scoped (multi-tenant) endpoints
+"""
+import json
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from app import DEFAULT_SCHOOL, create_app, load_school_config
+from store import worker_for
+
+
+class TestSchoolEndpoints:
+    """Test class for /schools/{school_id} routes"""
+
+    def test_list_schools(self, client, other_school):
+        """Test that every registered school is listed"""
+        response = client.get("/schools")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data[DEFAULT_SCHOOL]["name"] == "Mergington High School"
+        assert data["riverside"]["name"] == "Riverside Middle School"
+
+    def test_default_school_matches_legacy_routes(self, client):
+        """Test that /activities serves the default school's catalog"""
+        legacy = client.get("/activities").json()
+        scoped = client.get(f"/schools/{DEFAULT_SCHOOL}/activities").json()
+
+        assert legacy == scoped
+
+    def test_unknown_school(self, client):
+        """Test that requests for an unknown school return 404"""
+        response = client.get("/schools/nowhere/activities")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert "school not found" in response.json()["detail"].lower()
+
+        response = client.post("/schools/nowhere/activities/Chess%20Club/signup?email=a@b.edu")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_signup_is_isolated_per_school(self, client, schools, activities, other_school):
+        """Test that a signup at one school does not touch another school"""
+        email = "newstudent@riverside.edu"
+        mergington_version = schools.get(DEFAULT_SCHOOL).version
+
+        response = client.post(f"/schools/riverside/activities/Chess Club/signup?email={email}")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert email in other_school.activities["Chess Club"]["participants"]
+        assert email not in activities["Chess Club"]["participants"]
+        assert schools.get(DEFAULT_SCHOOL).version == mergington_version
+
+    def test_unregister_at_school(self, client, other_school):
+        """Test removing a participant through a school-scoped route"""
+        response = client.delete("/schools/riverside/activities/Chess Club/participants/amy@riverside.edu")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert other_school.activities["Chess Club"]["participants"] == []
+
+        response = client.delete("/schools/riverside/activities/Chess Club/participants/amy@riverside.edu")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_activity_not_in_school(self, client, other_school):
+        """Test that activities are scoped to their own school"""
+        response = client.post("/schools/riverside/activities/Drama Club/signup?email=a@riverside.edu")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert "activity not found" in response.json()["detail"].lower()
+
+
+class TestActivityStore:
+    """Test the per-school store and registry"""
+
+    def test_serialized_cache_tracks_version(self, other_school):
+        """Test that the cached body is reused until the store changes"""
+        first = other_school.serialized()
+        assert other_school.serialized() is first
+
+        other_school.signup("Chess Club", "bo@riverside.edu")
+
+        second = other_school.serialized()
+        assert second is not first
+        assert b"bo@riverside.edu" in second
+
+    def test_snapshot_is_independent(self, schools, activities):
+        """Test that a snapshot does not share participant lists with the store"""
+        store = schools.get(DEFAULT_SCHOOL)
+        snapshot = store.snapshot()
+
+        store.signup("Chess Club", "later@mergington.edu")
+
+        assert "later@mergington.edu" not in snapshot["Chess Club"]["participants"]
+        assert snapshot["Chess Club"]["participants"] is not activities["Chess Club"]["participants"]
+
+    def test_restore_rolls_back_in_place(self, schools, activities):
+        """Test that restore() rewinds the catalog and invalidates its caches"""
+        store = schools.get(DEFAULT_SCHOOL)
+        snapshot = store.snapshot()
+        before = store.serialized()
+
+        store.signup("Chess Club", "later@mergington.edu")
+        store.restore(snapshot)
+        store.restore(snapshot)
+        store.signup("Drama Club", "other@mergington.edu")
+        store.restore(snapshot)
+
+        assert store.activities is activities
+        assert activities == snapshot
+        assert store.serialized() == before
+
+    def test_registry_snapshot_covers_all_schools(self, schools, other_school):
+        """Test snapshot/restore across every school in a registry"""
+        snapshot = schools.snapshot()
+
+        other_school.unregister("Chess Club", "amy@riverside.edu")
+        schools.restore(snapshot)
+
+        assert set(snapshot) == {DEFAULT_SCHOOL, "riverside"}
+        assert other_school.activities["Chess Club"]["participants"] == ["amy@riverside.edu"]
+
+    def test_duplicate_school_rejected(self, other_school, schools):
+        """Test that a school id can only be registered once"""
+        with pytest.raises(ValueError):
+            schools.add("riverside", "Another Riverside")
+
+
+
+def district(count):
+    """Build a school config with count small schools"""
+    return {
+        f"school-{i}": {
+            "name": f"School {i}",
+            "activities": {
+                "Chess Club": {
+                    "description": "Learn strategies and compete in chess tournaments",
+                    "schedule": "Mondays, 3:00 PM - 4:00 PM",
+                    "max_participants": 10,
+                    "participants": []
+                }
+            }
+        }
+        for i in range(count)
+    }
+
+
+class TestDistrictConfig:
+    """Test school configuration and partitioning across worker processes"""
+
+    def test_configured_schools_are_served(self):
+        """Test that every school in the config gets its own shard"""
+        with TestClient(create_app(school_config=district(3))) as client:
+            data = client.get("/schools").json()
+            response = client.post("/schools/school-2/activities/Chess Club/signup?email=a@s2.edu")
+
+        assert set(data) == {"school-0", "school-1", "school-2"}
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_partitions_cover_every_school_once(self):
+        """Test that worker partitions split the district without overlap"""
+        config = district(20)
+        owned = [
+            {store.school_id for store in
+             create_app(school_config=config, worker_index=index, worker_count=3).state.schools}
+            for index in range(3)
+        ]
+
+        assert set().union(*owned) == set(config)
+        assert sum(len(ids) for ids in owned) == 20
+        for index, ids in enumerate(owned):
+            assert all(worker_for(school_id, 3) == index for school_id in ids)
+
+    def test_other_workers_school_is_misdirected(self):
+        """Test that a school owned by another worker returns 421 and its owner"""
+        config = district(20)
+        app = create_app(school_config=config, worker_index=0, worker_count=3)
+        foreign = next(school_id for school_id in config if worker_for(school_id, 3) != 0)
+
+        with TestClient(app) as client:
+            response = client.get(f"/schools/{foreign}/activities")
+            missing = client.get("/schools/nowhere/activities")
+
+        assert response.status_code == 421
+        assert response.headers["x-school-worker"] == str(worker_for(foreign, 3))
+        assert missing.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_invalid_worker_index(self):
+        """Test that a worker index outside the worker count is rejected"""
+        with pytest.raises(ValueError):
+            create_app(worker_index=2, worker_count=2)
+
+    def test_load_school_config(self, tmp_path):
+        """Test reading a district config file"""
+        path = tmp_path / "schools.json"
+        path.write_text(json.dumps(district(2)))
+
+        assert load_school_config(str(path)) == district(2)
@@ -3,13 +3,13 @@ Tests for signup functionality
 """
 import pytest
 from fastapi import status
-from app import activities
+from app import DEFAULT_SCHOOL
 
 
 class TestSignupEndpoints:
     """Test class for signup-related endpoints"""
 
-    def test_signup_success(self, client, reset_activities):
+    def test_signup_success(self, client, activities):
         """Test successful signup for an activity"""
         activity_name = "Chess Club"
         email = "newstudent@mergington.edu"
@@ -29,7 +29,7 @@ class TestSignupEndpoints:
         assert len(activities[activity_name]["participants"]) == initial_count + 1
         assert email in activities[activity_name]["participants"]
 
-    def test_signup_duplicate_participant(self, client, reset_activities):
+    def test_signup_duplicate_participant(self, client):
         """Test signup when participant is already registered"""
         activity_name = "Chess Club"
         email = "michael@mergington.edu"  # Already registered
@@ -41,7 +41,7 @@ class TestSignupEndpoints:
         assert "detail" in data
         assert "already signed up" in data["detail"].lower()
 
-    def test_signup_nonexistent_activity(self, client, reset_activities):
+    def test_signup_nonexistent_activity(self, client):
         """Test signup for non-existent activity"""
         activity_name = "Nonexistent Club"
         email = "student@mergington.edu"
@@ -53,7 +53,7 @@ class TestSignupEndpoints:
         assert "detail" in data
         assert "not found" in data["detail"].lower()
 
-    def test_signup_url_encoding(self, client, reset_activities):
+    def test_signup_url_encoding(self, client, activities):
         """Test signup with URL-encoded activity name"""
         activity_name = "Programming Class"
         encoded_name = "Programming%20Class"
@@ -64,7 +64,7 @@ class TestSignupEndpoints:
         assert response.status_code == status.HTTP_200_OK
         assert email in activities[activity_name]["participants"]
 
-    def test_signup_special_characters_in_email(self, client, reset_activities):
+    def test_signup_special_characters_in_email(self, client, activities):
         """Test signup with special characters in email"""
         activity_name = "Art Workshop"
         email = "student.with.dots+tag@mergington.edu"
@@ -77,23 +77,20 @@ class TestSignupEndpoints:
         assert response.status_code == status.HTTP_200_OK
         assert email in activities[activity_name]["participants"]
 
-    def test_signup_capacity_check(self, client, reset_activities):
+    def test_signup_capacity_check(self, client, schools, activities):
         """Test that signup respects capacity limits"""
         # Create a small activity for testing
         test_activity = "Test Activity"
-        activities[test_activity] = {
+        schools.get(DEFAULT_SCHOOL).add_activity(test_activity, {
             "description": "Test activity with limited capacity",
             "schedule": "Test schedule",
             "max_participants": 2,
             "participants": ["student1@mergington.edu"]
-        }
+        })
         
         # Should be able to add one more participant
         response = client.post(f"/activities/{test_activity}/signup?email=student2@mergington.edu")
         assert response.status_code == status.HTTP_200_OK
         
         # Activity should now be at capacity
-        assert len(activities[test_activity]["participants"]) == 2
-        
-        # Clean up test activity
-        del activities[test_activity]
\ No newline at end of file
+        assert len(activities[test_activity]["participants"]) == 2
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""
+Tests for the GET /activities/stats endpoint and occupancy counters
+"""
+import pytest
+from fastapi import status
+from app import DEFAULT_SCHOOL
+
+
+def scan_stats(activities):
+    """Recompute occupancy from the participant lists for comparison"""
+    return {
+        name: (len(details["participants"]), details["max_participants"])
+        for name, details in activities.items()
+    }
+
+
+class TestStatsEndpoint:
+    """Test class for the activity stats endpoint"""
+
+    def test_stats_structure(self, client, activities):
+        """Test that stats cover every activity without participant lists"""
+        response = client.get("/activities/stats")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert len(data["activities"]) == len(activities)
+        for row in data["activities"]:
+            assert "participants" not in row
+            occupancy, capacity = scan_stats(activities)[row["name"]]
+            assert row["occupancy"] == occupancy
+            assert row["max_participants"] == capacity
+            assert row["remaining"] == capacity - occupancy
+            assert row["fill_ratio"] == pytest.approx(occupancy / capacity)
+
+    def test_stats_ordering(self, client):
+        """Test fullest-first and emptiest-first ordering"""
+        fullest = client.get("/activities/stats").json()["activities"]
+        emptiest = client.get("/activities/stats?order=emptiest").json()["activities"]
+
+        ratios = [row["fill_ratio"] for row in fullest]
+        assert ratios == sorted(ratios, reverse=True)
+        assert [row["fill_ratio"] for row in emptiest] == sorted(ratios)
+        # Chess Club has the smallest capacity of the seed data
+        assert fullest[0]["name"] == "Chess Club"
+        assert emptiest[0]["name"] == "Gym Class"
+
+    def test_stats_ties_in_name_order(self, client):
+        """Test that activities with equal fill ratios are listed by name in both orders"""
+        for order in ("fullest", "emptiest"):
+            rows = client.get(f"/activities/stats?order={order}").json()["activities"]
+            tied = [row["name"] for row in rows if row["fill_ratio"] == pytest.approx(0.1)]
+
+            assert tied == ["Drama Club", "Programming Class", "Science Club"]
+
+    def test_stats_limit(self, client):
+        """Test that limit returns only the top entries"""
+        data = client.get("/activities/stats?limit=3").json()
+
+        assert len(data["activities"]) == 3
+        assert client.get("/activities/stats?limit=0").status_code == 422
+        assert client.get("/activities/stats?order=random").status_code == 422
+
+    def test_stats_follow_mutations(self, client, activities):
+        """Test that counters, ordering and totals update on signup and removal"""
+        for i in range(8):
+            client.post(f"/activities/Science Club/signup?email=s{i}@mergington.edu")
+        client.delete("/activities/Chess Club/participants/michael@mergington.edu")
+
+        data = client.get("/activities/stats").json()
+
+        assert data["activities"][0]["name"] == "Science Club"
+        rows = {row["name"]: row for row in data["activities"]}
+        assert rows["Science Club"]["occupancy"] == 10
+        assert rows["Chess Club"]["occupancy"] == 1
+        expected = scan_stats(activities)
+        assert data["totals"]["occupancy"] == sum(o for o, _ in expected.values())
+        assert data["totals"]["max_participants"] == sum(c for _, c in expected.values())
+        assert data["totals"]["remaining"] == sum(c - o for o, c in expected.values())
+
+    def test_school_stats(self, client, other_school):
+        """Test the school-scoped stats endpoint"""
+        data = client.get("/schools/riverside/activities/stats").json()
+
+        assert data["activities"] == [{"name": "Chess Club", "occupancy": 1,
+                                       "max_participants": 10, "remaining": 9,
+                                       "fill_ratio": 0.1}]
+        assert client.get("/schools/nowhere/activities/stats").status_code == 404
+
+
+class TestOccupancyCounters:
+    """Test the store's incrementally maintained counters"""
+
+    def test_empty_school_totals(self, schools):
+        """Test that a school without activities reports a zero fill ratio"""
+        store = schools.add("empty", "Empty School")
+
+        assert store.stats() == {
+            "totals": {"occupancy": 0, "max_participants": 0, "remaining": 0, "fill_ratio": 0.0},
+            "activities": []
+        }
+
+    def test_counters_survive_restore(self, schools):
+        """Test that restore() rebuilds the counters from the snapshot"""
+        store = schools.get(DEFAULT_SCHOOL)
+        snapshot = store.snapshot()
+        before = store.stats()
+
+        store.signup("Art Workshop", "painter@mergington.edu")
+        store.restore(snapshot)
+
+        assert store.stats() == before
+
+    def test_full_activity_has_no_remaining_seats(self, schools):
+        """Test that an activity at capacity reports zero remaining seats"""
+        store = schools.get(DEFAULT_SCHOOL)
+        store.add_activity("Tiny Club", {
+            "description": "One seat only",
+            "schedule": "Never",
+            "max_participants": 1,
+            "participants": ["only@mergington.edu"]
+        })
+
+        top = store.stats(limit=1)["activities"][0]
+
+        assert top == {"name": "Tiny Club", "occupancy": 1, "max_participants": 1,
+                       "remaining": 0, "fill_ratio": 1.0}
+        with pytest.raises(ValueError):
+            store.add_activity("Tiny Club", {"max_participants": 1, "participants": []})
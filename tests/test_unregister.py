@@ -3,13 +3,12 @@ Tests for unregister functionality
 """
 import pytest
 from fastapi import status
-from app import activities
 
 
 class TestUnregisterEndpoints:
     """Test class for unregister-related endpoints"""
 
-    def test_unregister_success(self, client, reset_activities):
+    def test_unregister_success(self, client, activities):
         """Test successful unregistration from an activity"""
         activity_name = "Chess Club"
         email = "michael@mergington.edu"  # Already registered
@@ -30,7 +29,7 @@ class TestUnregisterEndpoints:
         assert len(activities[activity_name]["participants"]) == initial_count - 1
         assert email not in activities[activity_name]["participants"]
 
-    def test_unregister_not_registered(self, client, reset_activities):
+    def test_unregister_not_registered(self, client, activities):
         """Test unregistration when participant is not registered"""
         activity_name = "Chess Club"
         email = "notregistered@mergington.edu"
@@ -45,7 +44,7 @@ class TestUnregisterEndpoints:
         assert "detail" in data
         assert "not registered" in data["detail"].lower()
 
-    def test_unregister_nonexistent_activity(self, client, reset_activities):
+    def test_unregister_nonexistent_activity(self, client):
         """Test unregistration from non-existent activity"""
         activity_name = "Nonexistent Club"
         email = "student@mergington.edu"
@@ -57,7 +56,7 @@ class TestUnregisterEndpoints:
         assert "detail" in data
         assert "not found" in data["detail"].lower()
 
-    def test_unregister_url_encoding(self, client, reset_activities):
+    def test_unregister_url_encoding(self, client, activities):
         """Test unregistration with URL-encoded parameters"""
         activity_name = "Programming Class"
         encoded_activity = "Programming%20Class"
@@ -72,7 +71,7 @@ class TestUnregisterEndpoints:
         assert response.status_code == status.HTTP_200_OK
         assert email not in activities[activity_name]["participants"]
 
-    def test_unregister_special_characters_in_email(self, client, reset_activities):
+    def test_unregister_special_characters_in_email(self, client, activities):
         """Test unregistration with email containing special characters"""
         activity_name = "Science Club"
         special_email = "student.with.dots+tag@mergington.edu"
@@ -89,7 +88,7 @@ class TestUnregisterEndpoints:
         assert len(activities[activity_name]["participants"]) == initial_count - 1
         assert special_email not in activities[activity_name]["participants"]
 
-    def test_signup_then_unregister_workflow(self, client, reset_activities):
+    def test_signup_then_unregister_workflow(self, client, activities):
         """Test complete workflow: signup then unregister"""
         activity_name = "Math Olympiad"
         email = "testworkflow@mergington.edu"